@@ -0,0 +1,122 @@
+import numpy as np
+
+class DenseOutput:
+    """
+    Class to hold a compact representation of a simulation run which can be
+    used to find the concentrations at any time within the run afterwards.
+
+    The concentration and rate of change of concentration of each species are
+    stored at points (knots) during the run. Between knots the concentrations
+    are found by cubic Hermite interpolation, so storage only grows with the
+    number of knots rather than the number of times the run is evaluated at.
+
+    Variables:
+        keys:       list    Names of each species
+        t:          array   Time of each knot
+        y:          array   Concentrations at each knot, shape (knot, species)
+        dydt:       array   Rates of change of concentration at each knot,
+                            shape (knot, species)
+
+    Methods:
+        add(self, t, concs, rates)          Adds a knot
+        evaluate(self, times, keys)         Returns concentrations at times
+        resample(self, start, end, count)   Returns concentrations on a
+                                            uniform grid
+        save(self, dir)                     Saves to a .npz file
+        load(cls, dir)                      Loads from a .npz file
+    """
+
+    def __init__(self, keys):
+        self.keys = list(keys)
+        self.t = np.array([])
+        self.y = np.zeros((0, len(self.keys)))
+        self.dydt = np.zeros((0, len(self.keys)))
+
+        #Knots are added to lists while simulating and only converted to
+        #arrays when they are needed, as appending to arrays is slow
+        self.new_knots = []
+
+    def add(self, t, concs, rates):
+        """
+        Adds a knot at time t. concs and rates are dictionaries with an entry
+        for each species, as returned by Reaction.get_concs() and
+        Reaction.get_rates(). Knots must be added in order of time.
+        """
+        self.new_knots.append((
+            t,
+            [concs[key] for key in self.keys],
+            [rates[key] for key in self.keys]
+        ))
+
+    def update_arrays(self):
+        #Moves any new knots into the arrays
+        if len(self.new_knots) == 0:
+            return
+        t, y, dydt = zip(*self.new_knots)
+        self.t = np.concatenate([self.t, t])
+        self.y = np.concatenate([self.y, y])
+        self.dydt = np.concatenate([self.dydt, dydt])
+        self.new_knots = []
+
+    def evaluate(self, times, keys=None):
+        """
+        Returns the concentrations at each time in times as a dictionary of
+        arrays, one for time and one for each species, in the same format as
+        simulate_fixed(). If keys is specified only those species are
+        included.
+
+        Raises a ValueError if any time is outside of the run.
+        """
+        self.update_arrays()
+        if keys is None:
+            keys = self.keys
+        times = np.asarray(times, dtype=float)
+        if len(self.t) < 2:
+            raise ValueError("At least two knots are needed to interpolate")
+        if np.any(times < self.t[0]) or np.any(times > self.t[-1]):
+            raise ValueError("Times must be between %e and %e"
+                             % (self.t[0], self.t[-1]))
+
+        #Find the knots either side of each time
+        i = np.searchsorted(self.t, times, side="right") - 1
+        i = np.clip(i, 0, len(self.t) - 2)
+        h = self.t[i + 1] - self.t[i]
+        s = (times - self.t[i]) / h
+
+        #Cubic Hermite basis functions
+        h00 = 2 * s**3 - 3 * s**2 + 1
+        h10 = s**3 - 2 * s**2 + s
+        h01 = -2 * s**3 + 3 * s**2
+        h11 = s**3 - s**2
+
+        data = {"t":times}
+        for key in keys:
+            j = self.keys.index(key)
+            data[key] = h00 * self.y[i, j] \
+                      + h10 * h * self.dydt[i, j] \
+                      + h01 * self.y[i + 1, j] \
+                      + h11 * h * self.dydt[i + 1, j]
+        return data
+
+    def resample(self, start, end, count, keys=None):
+        """
+        Returns the concentrations at count evenly spaced times from start to
+        end, in the same format as evaluate().
+        """
+        return self.evaluate(np.linspace(start, end, count), keys=keys)
+
+    def save(self, dir):
+        #Saves knots to a .npz file at dir
+        self.update_arrays()
+        np.savez(dir, keys=np.array(self.keys), t=self.t, y=self.y,
+                 dydt=self.dydt)
+
+    @classmethod
+    def load(cls, dir):
+        #Loads knots from a .npz file generated by save()
+        with np.load(dir) as f:
+            dense = cls([str(key) for key in f["keys"]])
+            dense.t = f["t"]
+            dense.y = f["y"]
+            dense.dydt = f["dydt"]
+        return dense
@@ -1,9 +1,13 @@
 from reaction import *
+from shared_results import SharedResults
+from dense_output import DenseOutput
 import numpy as np
 import matplotlib.pyplot as plt
 import json
 import time
 import os
+import copy
+import multiprocessing as mp
 
 class Timer():
     #Simple object to handle timing of program run times    
@@ -53,6 +57,12 @@ def command_input():
         elif command == "protein_fold_data":
             generate_protein_fold_data(args)
             valid = True
+        elif command == "urea_time_simulate":
+            urea_time_simulate(args)
+            valid = True
+        elif command == "interpolate":
+            interpolate(args)
+            valid = True
         elif command == "help":
             if len(args) == 0:
                 commands()
@@ -88,45 +98,14 @@ def time_simulate(args):
         return None
 
     #Get parameters for reaction
-    t = Timer()
     try:
-        rxn, parameters = reaction_from_json(file)
+        reaction_from_json(file)
     except:
         print("File not found")
         return None
     dir = specify_output_file()
-    
-    delta_t = float(parameters["delta_t"])
-    max_cycles = int(parameters["max_cycles"])
-    sample_freq = int(parameters["sample_frequency"])
-    equillibrium_gradient = float(parameters["equillibrium_gradient"])
-    log = int(parameters["log_frequency"])
-    
-
-    #Run appropriate simulation
-    t.start()
-    if mode == "fixed":
-        data = simulate_fixed(
-                            rxn, 
-                            delta_t, 
-                            max_cycles, 
-                            log=log, 
-                            sample_freq=sample_freq
-                    )
-
-    if mode == "equillibrium":
-        data = simulate_to_equillibrium(
-                            rxn,
-                            delta_t,
-                            equillibrium_gradient,
-                            max_cycles=max_cycles,
-                            log=log,
-                            sample_freq=sample_freq
-        )
 
-    parameters["Run Time"] = t.stop()
-    
-    time_evolution_output_file(data, parameters,dir)
+    run_time_simulation(mode, file, dir)
 
 def plot(args):
     """
@@ -171,6 +150,11 @@ def generate_protein_fold_data(args):
     #Parse command arguments and stop function if syntax invalid
     try:
         file = args[0].replace(".json","") + ".json"
+        workers = 1
+        if len(args) > 1:
+            workers = int(args[1])
+            if workers < 1:
+                raise ValueError("workers must be at least 1")
     except:
         print("Invalid syntax")
         correct_syntax("protein_fold_data")
@@ -178,82 +162,332 @@ def generate_protein_fold_data(args):
 
     #Get parameters
     try:
-        with open("reaction_configs\\"+file,"r") as f:
-            jsondata = json.load(f)
+        reaction_from_json(file)
     except:
         print("File not found")
         return None
 
-    u_min = jsondata["parameters"]["urea_min"]
-    u_max = jsondata["parameters"]["urea_max"]
-    u_steps = jsondata["parameters"]["urea_steps"]
+    dir = specify_output_file()
+
+    run_protein_fold_data(file, dir, workers=workers)
+
+def urea_time_simulate(args):
+    """
+    Simulates reaction over time at each urea concentration in a range, with
+    the runs split between several processes, and generates output data file.
+    """
+    #Parse command arguments and stop function if syntax invalid
+    try:
+        file = args[0].replace(".json","") + ".json"
+        workers = None
+        if len(args) > 1:
+            workers = int(args[1])
+            if workers < 1:
+                raise ValueError("workers must be at least 1")
+    except:
+        print("Invalid syntax")
+        correct_syntax("urea_time_simulate")
+        return None
+
+    #Get parameters
+    try:
+        reaction_from_json(file)
+    except:
+        print("File not found")
+        return None
+
+    dir = specify_output_file()
+
+    run_urea_time_simulation(file, dir, workers=workers)
+
+def interpolate(args):
+    """
+    Evaluates a run saved as dense output at the specified times and 
+    generates output data file
+    """
+    #Parse command arguments and stop function if syntax invalid
+    try:
+        times = parse_times(args[0])
+    except:
+        print("Invalid syntax")
+        correct_syntax("interpolate")
+        return None
+
+    #Load dense output and interpolate
+    dense = DenseOutput.load(specify_input_file(".dense.npz"))
+    try:
+        data = dense.evaluate(times)
+    except ValueError as e:
+        print(e)
+        return None
+
+    dir = specify_output_file()
+
+    info = "Interpolated from dense output with %i points \n" % len(dense.t)
+    write_to_file(data, dir, info)
+
+def parse_times(arg):
+    """
+    Returns array of times from either a list of times separated by commas,
+    e.g. 0.5,1,2.5, or a uniform grid given as start:end:count, e.g. 0:9:100
+    """
+    if ":" in arg:
+        start, end, count = arg.split(":")
+        return np.linspace(float(start), float(end), int(count))
+    return np.array([float(t) for t in arg.split(",")])
+
+#Functions that do the work for each command without any user input, so they
+#can also be called by the simulation server
+
+def run_time_simulation(mode, file, dir, progress=None):
+    """
+    Simulates reaction in the specified mode using the parameters from json
+    config file and writes the data to the output file dir. Returns the data.
+
+    If progress is specified it is called with (iterations completed, total)
+    instead of logging progress to the console.
+
+    If the parameter dense_frequency is specified and not 0, dense output 
+    with a point every dense_frequency iterations is also saved alongside
+    the output file (see dense_output_path()).
+    """
+    t = Timer()
+    rxn, parameters = reaction_from_json(file)
+
+    delta_t = float(parameters["delta_t"])
+    max_cycles = int(parameters["max_cycles"])
+    sample_freq = int(parameters["sample_frequency"])
+    equillibrium_gradient = float(parameters["equillibrium_gradient"])
+    log = int(parameters["log_frequency"])
+    dense_freq = int(parameters.get("dense_frequency", 0))
+    dense = None
+    if dense_freq != 0:
+        dense = DenseOutput(rxn.get_species_keys())
+    
+
+    #Run appropriate simulation
+    t.start()
+    if mode == "fixed":
+        data = simulate_fixed(
+                            rxn, 
+                            delta_t, 
+                            max_cycles, 
+                            log=log, 
+                            sample_freq=sample_freq,
+                            progress=progress,
+                            dense=dense,
+                            dense_freq=dense_freq
+                    )
+
+    if mode == "equillibrium":
+        data = simulate_to_equillibrium(
+                            rxn,
+                            delta_t,
+                            equillibrium_gradient,
+                            max_cycles=max_cycles,
+                            log=log,
+                            sample_freq=sample_freq,
+                            progress=progress,
+                            dense=dense,
+                            dense_freq=dense_freq
+        )
+
+    parameters["Run Time"] = t.stop()
+    
+    time_evolution_output_file(data, parameters,dir)
+    if dense is not None:
+        dense.save(dense_output_path(dir))
+    return data
+
+def run_protein_fold_data(file, dir, progress=None, workers=1):
+    """
+    Generates the urea range data for the protein folding reaction in json
+    config file and writes it to the output file dir. Returns the data.
+
+    If progress is specified it is called with (urea steps completed, total
+    steps) as each urea concentration is finished.
+
+    If workers is not 1 the urea concentrations are split between that many 
+    processes (one per CPU if None).
+    """
+    reaction, parameters = reaction_from_json(file)
+
+    u_min = parameters["urea_min"]
+    u_max = parameters["urea_max"]
+    u_steps = parameters["urea_steps"]
 
     #Generate header for output file
     info  = ""
     info += "Parameters: \n"
-    for key in jsondata["parameters"].keys():
-        info += "%s : %f \n" % (key, jsondata["parameters"][key])
+    for key in parameters.keys():
+        info += "%s : %f \n" % (key, parameters[key])
     info += "\nInitial concentrations: \n"
-    for s in jsondata["species"]:
-        info += "%s : %f \n" % (s["name"], s["init_conc"])
-
-    dir = specify_output_file()
+    init_concs = reaction.get_concs()
+    for key in init_concs.keys():
+        info += "%s : %f \n" % (key, init_concs[key])
 
     #Generate the data
-    data = values_over_urea_range(u_min, u_max, u_steps, file)
+    data = values_over_urea_range(u_min, u_max, u_steps, file, 
+                                  progress=progress, workers=workers)
     write_to_file(data, dir, info)
+    return data
+
+def run_urea_time_simulation(file, dir, workers=None):
+    """
+    Simulates reaction in json config file in fixed mode at each urea 
+    concentration in its urea range, using workers processes (one per CPU if
+    None), and writes the data to the output file dir. 
+
+    The columns for each run are named after the species with the index of 
+    the urea concentration appended, e.g. A_0, A_1, ...
+    """
+    t = Timer()
+    _, parameters = reaction_from_json(file)
+    urea_range = np.linspace(parameters["urea_min"], 
+                             parameters["urea_max"], 
+                             parameters["urea_steps"])
+
+    t.start()
+    results, times, keys = simulate_fixed_parallel(file, urea_range, workers)
+    parameters = dict(parameters)
+    parameters["Run Time"] = t.stop()
+
+    #Generate header for output file
+    info  = ""
+    info += "Parameters: \n"
+    for key in parameters.keys():
+        info += "%s : %f \n" % (key, parameters[key])
+    info += "\nUrea concentrations: \n"
+    for i, u in enumerate(urea_range):
+        info += "%i : %f \n" % (i, u)
+
+    #Columns are views of the shared memory, so nothing is copied before it
+    #is written to the file
+    data = {"t":times}
+    for run in range(len(urea_range)):
+        run_data = results.run_data(run, times, keys)
+        for key in keys:
+            data["%s_%i" % (key, run)] = run_data[key]
+    try:
+        write_to_file(data, dir, info)
+    finally:
+        #Views of the shared memory must be removed before it is closed
+        data = None
+        run_data = None
+        results.close()
+        results.unlink()
 
 #Reaction simulation functions
 
-def simulate_fixed(reaction, delta_t, steps, log=0, sample_freq=1):
+def simulate_fixed(
+    reaction, 
+    delta_t, 
+    steps, 
+    log=0, 
+    sample_freq=1, 
+    progress=None,
+    out=None,
+    dense=None,
+    dense_freq=1
+):
     """
     Simulates reaction over a specified number of steps with time interval 
     delta_t. Returns a dictionary of arrays, one for time and one for the
     concentration of each species at each point in time.
 
-    If log is specified, logs progress in console every log interations.
+    If log is specified, logs progress in console every log interations. If
+    progress is also specified it is called with (iterations completed, 
+    steps) instead, and always once the last iteration is completed.
 
     If sample_freq is specified only adds data every sample_freq iterations to
     the array. This allows simulating a reaction with a finer timescale than 
     the output data, which would otherwise result in very large output files.
+
+    If out is specified the concentrations are written straight into it 
+    instead of into new arrays. out must be a numpy array with one row for 
+    each sample (see fixed_samples()) and one column for each species, which
+    allows runs in other processes to write into shared memory.
+
+    If dense is specified, a point is added to this DenseOutput object every
+    dense_freq iterations and at the end of the run.
     """
     #Set up arrays to store the data and store within dictionary 'data'
     data = {}
-    data["t"] = []
-    keys = []
-    for key in reaction.get_species_keys():
-        keys.append(key)
-        data[key] = []
+    keys = list(reaction.get_species_keys())
+    if out is None:
+        data["t"] = []
+        for key in keys:
+            data[key] = []
+    else:
+        data["t"] = fixed_sample_times(delta_t, len(out), sample_freq)
     
     #Simulation loop - store data at each point in time and then update
     for i in range(steps):
         
         #Tick reaction
-        reaction.tick(delta_t)
+        if dense is not None and i % dense_freq == 0:
+            dense_tick(reaction, delta_t * i, delta_t, dense)
+        else:
+            reaction.tick(delta_t)
 
-        #Only record data every sample_freq samples
+        #Only record data every sample_freq samples. The reaction has now
+        #been ticked i + 1 times
         if i % sample_freq ==0:
-            data["t"].append(delta_t * i)
             c = reaction.get_concs()
-            for key in keys:
-                data[key].append(c[key])
+            if out is None:
+                data["t"].append(delta_t * (i + 1))
+                for key in keys:
+                    data[key].append(c[key])
+            else:
+                for j, key in enumerate(keys):
+                    out[i // sample_freq, j] = c[key]
         
-        #Log progress
+        #Log progress. i + 1 iterations have been completed
         if log != 0:
-            if i % log == 0:
+            if progress is not None:
+                if (i + 1) % log == 0 and i + 1 < steps:
+                    progress(i + 1, steps)
+            elif i % log == 0:
                 p = '{:.0%}'.format(i / steps)
 
                 print("Completed %i / %i iterations (%s)" % (i, steps, p))
 
+    if out is not None:
+        for j, key in enumerate(keys):
+            data[key] = out[:, j]
+
+    if dense is not None:
+        dense.add(delta_t * steps, reaction.get_concs(), reaction.get_rates())
+
+    if progress is not None:
+        progress(steps, steps)
+
     return data
 
+def dense_tick(reaction, t, delta_t, dense):
+    #Ticks reaction, first adding a point for time t to dense output 
+    rates = reaction.get_rates()
+    dense.add(t, reaction.get_concs(), rates)
+    reaction.tick(delta_t, rates)
+
+def fixed_samples(steps, sample_freq):
+    #Number of samples recorded by simulate_fixed()
+    return (steps + sample_freq - 1) // sample_freq
+
+def fixed_sample_times(delta_t, samples, sample_freq):
+    #Times of the samples recorded by simulate_fixed()
+    return delta_t * (sample_freq * np.arange(samples) + 1)
+
 def simulate_to_equillibrium(
     reaction, 
     delta_t, 
     gradient, 
     max_cycles=0,
     log=0,
-    sample_freq=1
+    sample_freq=1,
+    progress=None,
+    dense=None,
+    dense_freq=1
 ):
     """
     Simulates reaction with time interval delta_t until the difference in
@@ -265,11 +499,18 @@ def simulate_to_equillibrium(
     cycles is reached, regardless of whether equillibrium has been reached or
     not. 
 
-    If log is specified, logs progress in console every log interations.
+    If log is specified, logs progress in console every log interations. If
+    progress is also specified it is called with (iterations completed, 
+    max_cycles) instead. Once the simulation stops it is called with the 
+    number of iterations completed as both values, as this is only known 
+    then.
     
     If sample_freq is specified only adds data every sample_freq iterations to
     the array. This allows simulating a reaction with a finer timescale than 
     the output data, which would otherwise result in very large output files.
+
+    If dense is specified, a point is added to this DenseOutput object every
+    dense_freq iterations and at the end of the run.
     """
     #Set up dictionary to store data. We cannot predetermine the size of the
     #arrays as we don't know how many steps the simulation will run for
@@ -288,8 +529,11 @@ def simulate_to_equillibrium(
     while not equillibrium_reached:
         c_prev = c
     
+        if dense is not None and i % dense_freq == 0:
+            dense_tick(reaction, delta_t * i, delta_t, dense)
+        else:
+            reaction.tick(delta_t)
         i += 1  
-        reaction.tick(delta_t)
         c = reaction.get_concs()
         number_out_of_range = 0
 
@@ -318,11 +562,104 @@ def simulate_to_equillibrium(
         #Log progress every log steps
         if log != 0:
             if i % log == 0:
-                print("Running iteration %i" %i)
+                if progress is not None:
+                    if not equillibrium_reached:
+                        progress(i, max_cycles)
+                else:
+                    print("Running iteration %i" %i)
         
+    if dense is not None:
+        dense.add(delta_t * i, c, reaction.get_rates())
+
+    if progress is not None:
+        progress(i, i)
     
     return data
 
+#Functions to run several simulations in parallel. Each run writes its data
+#into a block of shared memory with shape (run, sample, species) so that it
+#doesn't have to be copied back to the parent process.
+
+def simulate_fixed_parallel(file, denaturant_concs, workers=None):
+    """
+    Runs simulate_fixed() for the reaction in json config file at each 
+    denaturant concentration, split between workers processes (one per CPU if
+    None).
+
+    Returns a tuple of the SharedResults object holding the data, an array of
+    the sample times and a list of the species keys. The caller must close()
+    and unlink() the SharedResults once it has finished with the data.
+    """
+    reaction, parameters = reaction_from_json(file)
+    keys = list(reaction.get_species_keys())
+    delta_t = float(parameters["delta_t"])
+    steps = int(parameters["max_cycles"])
+    sample_freq = int(parameters["sample_frequency"])
+    samples = fixed_samples(steps, sample_freq)
+
+    results = SharedResults.create(len(denaturant_concs), samples, len(keys))
+    tasks = []
+    for run, u in enumerate(denaturant_concs):
+        tasks.append((results.name, results.shape, run, file, float(u)))
+
+    try:
+        run_parallel(fixed_run_worker, tasks, workers)
+    except:
+        results.close()
+        results.unlink()
+        raise
+
+    times = fixed_sample_times(delta_t, samples, sample_freq)
+    return results, times, keys
+
+def run_parallel(worker, tasks, workers, progress=None):
+    #Runs worker on each task using a pool of processes, logging progress as
+    #each task finishes
+    with mp.Pool(workers) as pool:
+        for i, _ in enumerate(pool.imap_unordered(worker, tasks)):
+            if progress is not None:
+                progress(i + 1, len(tasks))
+            else:
+                print("Completed %i / %i runs" % (i + 1, len(tasks)))
+
+def fixed_run_worker(task):
+    #Runs one simulate_fixed() run in a worker process, writing the data to
+    #its row of the shared results
+    name, shape, run, file, denaturant_conc = task
+    reaction, parameters = reaction_from_json(
+        file, 
+        denaturant_conc=denaturant_conc
+    )
+    with SharedResults.attach(name, shape) as results:
+        simulate_fixed(
+            reaction,
+            float(parameters["delta_t"]),
+            int(parameters["max_cycles"]),
+            sample_freq=int(parameters["sample_frequency"]),
+            out=results.array[run]
+        )
+
+def equillibrium_run_worker(task):
+    #Runs one reaction to equillibrium in a worker process, writing the 
+    #equillibrium values to its row of the shared results
+    name, shape, run, file, denaturant_conc = task
+    reaction, parameters = reaction_from_json(
+        file, 
+        denaturant_conc=denaturant_conc
+    )
+    data = simulate_to_equillibrium(
+        reaction,
+        parameters["delta_t"],
+        parameters["equillibrium_gradient"],
+        max_cycles=parameters["max_cycles"]
+    )
+    keys = reaction.get_species_keys()
+    eq_values = get_equillibrium_values(data, keys)
+
+    with SharedResults.attach(name, shape) as results:
+        for j, key in enumerate(keys):
+            results.array[run, 0, j] = eq_values[key]
+
 #Specific functions for urea concentration plot
 
 def denaturant_rate_multiply(rate, conc, constant):
@@ -345,9 +682,22 @@ def get_equillibrium_values(data, keys):
     
     return values
 
-def values_over_urea_range(conc_min, conc_max, count, file):
+def values_over_urea_range(
+    conc_min, 
+    conc_max, 
+    count, 
+    file, 
+    progress=None,
+    workers=1
+):
     """
     Simulates reaction over a range of urea values and generates output data
+
+    If progress is specified it is called with (urea values completed, 
+    count) as each urea value is finished.
+
+    If workers is not 1 the urea values are split between that many processes
+    (one per CPU if None).
     """
     #Setup output dictionary
     urea_range = np.linspace(conc_min, conc_max, count)
@@ -355,10 +705,27 @@ def values_over_urea_range(conc_min, conc_max, count, file):
     output["urea"] = urea_range
     arrays_initialised = False
 
+    if workers != 1:
+        reaction, _ = reaction_from_json(file)
+        keys = list(reaction.get_species_keys())
+        results = SharedResults.create(len(urea_range), 1, len(keys))
+        tasks = []
+        for i, u in enumerate(urea_range):
+            tasks.append((results.name, results.shape, i, file, float(u)))
+        try:
+            run_parallel(equillibrium_run_worker, tasks, workers, progress)
+            for j, key in enumerate(keys):
+                output[key] = results.array[:, 0, j].copy()
+        finally:
+            results.close()
+            results.unlink()
+        return output
+
     #Run reaction at each urea value
     for i in range(len(urea_range)):
         u = urea_range[i]
-        print("Simulating reaction at urea concentration %.2f..." % u)
+        if progress is None:
+            print("Simulating reaction at urea concentration %.2f..." % u)
 
         #Setup reaction
         reaction, parameters = reaction_from_json(
@@ -368,13 +735,13 @@ def values_over_urea_range(conc_min, conc_max, count, file):
 
         #Get parameters
         delta_t = parameters["delta_t"]
-        equillibrium_threshold = parameters["equillibrium_threshold"]
+        equillibrium_gradient = parameters["equillibrium_gradient"]
         max_cycles = parameters["max_cycles"]
 
         #Simulate reaction
         data = simulate_to_equillibrium(reaction,
                                         delta_t, 
-                                        equillibrium_threshold, 
+                                        equillibrium_gradient, 
                                         max_cycles=max_cycles
                                         )
         
@@ -392,10 +759,17 @@ def values_over_urea_range(conc_min, conc_max, count, file):
         for key in keys:
             output[key][i] = eq_values[key]
 
+        if progress is not None:
+            progress(i + 1, len(urea_range))
+
     return output
 
 #Various file handling functions
 
+#Cache used by reaction_from_json(). Keys are config file paths and values 
+#are (mtime, reaction, parameters, denaturant constants) tuples
+REACTION_CACHE = {}
+
 def specify_output_file():
     #Handles user specifying data output file
     valid_file = False
@@ -413,14 +787,14 @@ def specify_output_file():
             print("Invalid file name")
     return dir 
 
-def specify_input_file():
+def specify_input_file(extension=".dat"):
     #Handles user specifying input data file
     valid_file = False
     while not valid_file:
         try:
             print("Please enter name of input file: ")
-            name = input().strip().replace(".dat","")
-            dir = os.path.join("output_files", "%s.dat" % name)
+            name = input().strip().replace(extension,"")
+            dir = os.path.join("output_files", name + extension)
             f = open(dir)
             f.close()
             valid_file = True
@@ -458,6 +832,10 @@ def write_to_file(data, dir, info):
                 line += "{0: <24}|".format(s)    
             f.write(line + "\n")
 
+def dense_output_path(dir):
+    #Returns path of dense output file saved alongside output file dir
+    return os.path.splitext(dir)[0] + ".dense.npz"
+
 def get_data_from_file(dir):
     #Gets data from file generated by write_to_file()
     with open(dir, "r") as f:
@@ -495,10 +873,38 @@ def reaction_from_json(json_file, denaturant_conc=0):
 
     If denaturant_conc is not 0 rates in the reaction for the appropriate steps
     are modified according to the concentration of denaturant.
+
+    The parsed config is cached for each file, so repeated calls (e.g. over
+    a urea range or from a long running server worker) only read the file 
+    again if it has been modified. A fresh copy of the reaction is returned
+    each time, with the denaturant applied to the copy, as Reaction objects 
+    are changed as they are simulated.
     """
 
-    #Load json data
     dir = os.path.join("reaction_configs", json_file)
+    mtime = os.path.getmtime(dir)
+    if dir not in REACTION_CACHE or REACTION_CACHE[dir][0] != mtime:
+        REACTION_CACHE[dir] = (mtime,) + build_reaction(dir)
+    _, reaction, parameters, constants = REACTION_CACHE[dir]
+    reaction, parameters = copy.deepcopy((reaction, parameters))
+
+    if denaturant_conc != 0:
+        for process, constant in zip(reaction.processes, constants):
+            if constant is None:
+                raise KeyError("denaturant_constant")
+            process["rate"] = denaturant_rate_multiply(process["rate"],
+                                                       denaturant_conc,
+                                                       constant)
+
+    output = (reaction, parameters)
+    return output
+
+def build_reaction(dir):
+    """
+    Builds a tuple of the Reaction object, the parameters and a list of the
+    denaturant constant of each process (None if not given) from json 
+    config file at dir
+    """
     with open(dir,"r") as f:
         data = json.load(f)
     
@@ -509,19 +915,16 @@ def reaction_from_json(json_file, denaturant_conc=0):
         init_conc = i["init_conc"]
         reaction.add_species(name, init_conc)
 
+    constants = []
     for entry in data["processes"]:
         reactants = entry["reactants"]
         products = entry["products"]
         rate = entry["rate"]
-        if denaturant_conc != 0:
-            denaturant_constant = entry["denaturant_constant"]
-            rate = denaturant_rate_multiply(rate, 
-                                            denaturant_conc, 
-                                            denaturant_constant)
         reaction.add_process(reactants, products, rate)
+        constants.append(entry.get("denaturant_constant"))
 
     parameters = data["parameters"]
-    output = (reaction, parameters)
+    output = (reaction, parameters, constants)
     return output
 
 def time_evolution_output_file(data, parameters, dir):
@@ -583,15 +986,16 @@ def plot_data(
 #   Main Program   #
 ####################
 
-#Startup
-load_command_syntax()
-#Main Program Loop
-while True:
-    welcome_message()
-    commands()
+if __name__ == "__main__":
+    #Startup
+    load_command_syntax()
+    #Main Program Loop
+    while True:
+        welcome_message()
+        commands()
 
-    command_input() #Set default=True for testing
+        command_input() #Set default=True for testing
 
-    input("Press enter to continue...")
-exit()
+        input("Press enter to continue...")
+    exit()
 
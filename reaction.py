@@ -11,7 +11,9 @@ class Reaction:
     Methods:
         add_species(self, name, species)    Adds a species to list
         add_process(self, process)          Adds a process to list
-        tick(self, delta_t)                 Proceeds reaction by time interval
+        tick(self, delta_t, rates)          Proceeds reaction by time interval
+        get_rates(self)                     Returns rate of change of 
+                                            concentration of each species
         get_species_keys(self)              Returns list of keys for each
                                             species
         get_concs(self)                     Returns concentrations of each
@@ -31,8 +33,7 @@ class Reaction:
     def add_species(self, name, init_conc):
         """ Adds entry to the species list with key 'name' """
         self.species_list[name] = {
-            "conc":init_conc,
-            "delta_conc":0.0
+            "conc":init_conc
         }
     
     def add_process(self, reactants, products, rate):
@@ -44,37 +45,50 @@ class Reaction:
         }
         self.processes.append(process)
 
-    def tick(self, delta_t):
+    def tick(self, delta_t, rates=None):
         """
         Updates all species according to each process over time interval 
-        delta_t
+        delta_t. 
+
+        If rates is specified it must be the result of get_rates() for the 
+        current concentrations, which saves calculating them again.
+        """
+        if rates is None:
+            rates = self.get_rates()
+
+        for key in self.species_list.keys():
+            self.species_list[key]["conc"] += rates[key] * delta_t
+
+    def get_rates(self):
         """
+        Returns the rate of change of concentration of each species due to
+        all processes at the current concentrations as a dictionary
+        """
+        rates = {}
+        for key in self.species_list.keys():
+            rates[key] = 0.0
 
-        #Iterate over each process in the list and calculate the necessary
-        #change in concentration of each species for the given time interval
+        #Iterate over each process in the list and calculate the rate of 
+        #change in concentration of each species
         for process in self.processes:
             reactants = process["reactants"]
             products = process["products"]
             k = process["rate"]
 
-            #Calculate change in concentration for this process step
-            change = k * delta_t
+            #Calculate rate for this process step
+            rate = k
             for r in reactants:
-                change =  change * self.species_list[r]["conc"]
+                rate = rate * self.species_list[r]["conc"]
             
-            #Decrease concentration of each reactant by this amount
+            #Decrease concentration of each reactant at this rate
             for r in reactants:
-                self.species_list[r]["delta_conc"] += -change
+                rates[r] += -rate
                 
-            
-            #Increase concentration of each product by this amount
+            #Increase concentration of each product at this rate
             for p in products:
-                self.species_list[p]["delta_conc"] += change
-        
-        for key in self.species_list.keys():
-            self.species_list[key]["conc"] += \
-                self.species_list[key]["delta_conc"]
-            self.species_list[key]["delta_conc"] = 0.0 
+                rates[p] += rate
+
+        return rates
 
     def get_species_keys(self):
         """
@@ -0,0 +1,478 @@
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import multiprocessing as mp
+import threading
+import queue
+import json
+import sys
+import os
+import uuid
+import time
+
+#Simulation functions are imported by each worker process when the pool
+#starts, so numpy, matplotlib and the reaction configs are only loaded once
+#per worker rather than once per job
+import main
+
+class JobServer():
+    """
+    Class to hold the job queue for the simulation server.
+
+    Jobs are run on a pool of worker processes which stay alive between jobs,
+    so each job does not pay the cost of starting Python and importing the
+    simulation code, and reactions already loaded by a worker are reused.
+
+    Only the latest progress message of each job is kept, and finished jobs
+    are removed after JOB_TTL seconds, or once there are more than 
+    MAX_FINISHED_JOBS of them, so memory use does not grow as more jobs are
+    run.
+
+    Variables:
+        jobs:       dict    Stores each job as a dictionary with key job id
+        pool:       Pool    Worker processes that run the jobs
+        events:     Queue   Messages sent from the workers as each job
+                            starts, progresses and finishes
+        updated:    Condition   Notified whenever any job changes
+        running:    dict    Stores (worker pid, output file) for each job
+                            that has started but not finished
+
+    Methods:
+        submit(self, request)       Validates and queues a job, returns its id
+        get(self, id)               Returns the current state of a job
+        summary(self, id)           Returns the state of a job without its
+                                    result
+        delete(self, id)            Removes a finished job
+        wait(self, id, seen)        Waits until a job has more than seen
+                                    progress updates or has finished
+        check_workers(self)         Fails jobs whose worker has died
+        close(self)                 Stops the worker pool
+    """
+
+    def __init__(self, workers):
+        self.jobs = {}
+        self.running = {}
+        self.updated = threading.Condition()
+        self.events = mp.Queue()
+        self.pool = mp.Pool(
+            workers,
+            initializer=init_worker,
+            initargs=(self.events, os.getcwd())
+        )
+
+        #Collect progress messages from the workers in the background
+        listener = threading.Thread(target=self.listen, daemon=True)
+        listener.start()
+
+    def submit(self, request):
+        """
+        Checks request is a valid job and adds it to the queue. Raises a
+        ValueError if the job is not valid.
+        """
+        if not isinstance(request, dict):
+            raise ValueError("Job must be a json object")
+        command = request.get("command")
+        if command not in JOB_COMMANDS:
+            raise ValueError("Unknown command %s" % command)
+        if "json" not in request:
+            raise ValueError("No json config file specified")
+        if command == "time_simulate":
+            if request.get("mode") not in ["fixed","equillibrium"]:
+                raise ValueError("Invalid mode")
+        if request.get("output") is not None:
+            check_output_name(request["output"])
+
+        id = uuid.uuid4().hex
+        dir = output_path(request.get("output"))
+        with self.updated:
+            self.jobs[id] = {
+                "id":id,
+                "request":request,
+                "status":"queued",
+                "progress":None,
+                "updates":0,
+                "result":None,
+                "error":None,
+                "finished":None
+            }
+            self.evict()
+
+        #The result of the job is sent back through self.events after its
+        #progress messages, so error_callback only handles jobs that could
+        #not be sent to a worker at all
+        self.pool.apply_async(
+            run_job,
+            (id, request, dir),
+            error_callback=lambda e: self.fail(id, e)
+        )
+        return id
+
+    def get(self, id):
+        #Returns a copy of a job so it can be sent while the job is updated,
+        #or None if there is no job with this id
+        with self.updated:
+            if id not in self.jobs:
+                return None
+            return dict(self.jobs[id])
+
+    def summary(self, id):
+        #Returns a copy of a job without its result, or None if there is no
+        #job with this id
+        job = self.get(id)
+        if job is not None:
+            del job["result"]
+        return job
+
+    def delete(self, id):
+        """
+        Removes a job. Returns False if the job has not finished yet, as it 
+        can't be stopped once it has been queued.
+        """
+        with self.updated:
+            if self.jobs[id]["status"] not in ["done","failed"]:
+                return False
+            del self.jobs[id]
+            self.updated.notify_all()
+        return True
+
+    def evict(self):
+        #Removes old finished jobs. Must be called holding self.updated
+        now = time.time()
+        finished = [job for job in self.jobs.values() 
+                    if job["finished"] is not None]
+        finished.sort(key=lambda job: job["finished"])
+        for i, job in enumerate(finished):
+            if now - job["finished"] > JOB_TTL \
+            or len(finished) - i > MAX_FINISHED_JOBS:
+                del self.jobs[job["id"]]
+
+    def wait(self, id, seen, timeout=None):
+        """
+        Blocks until job has more than seen progress updates or is no longer
+        queued or running, then returns the job. Returns None if the job has
+        been removed.
+        """
+        def changed():
+            if id not in self.jobs:
+                return True
+            job = self.jobs[id]
+            return job["updates"] > seen \
+                or job["status"] in ["done","failed"]
+
+        with self.updated:
+            self.updated.wait_for(changed, timeout=timeout)
+        return self.get(id)
+
+    def listen(self):
+        """
+        Updates jobs with messages from the workers. Each message is a tuple
+        of (job id, kind, payload), where kind is one of "started", 
+        "progress", "done" or "failed". Messages from a worker arrive in the
+        order they were sent, so a job only finishes after all of its 
+        progress has been recorded.
+        """
+        while True:
+            #Only check for dead workers once all waiting messages have been
+            #handled, so a job that finished just before its worker died 
+            #still gets its result
+            try:
+                id, kind, payload = self.events.get(timeout=WORKER_CHECK)
+            except queue.Empty:
+                self.check_workers()
+                continue
+            if kind == "done":
+                self.finish(id, payload)
+            elif kind == "failed":
+                self.fail(id, payload)
+            else:
+                with self.updated:
+                    if id not in self.jobs:
+                        continue
+                    job = self.jobs[id]
+                    if kind == "started" and job["status"] == "queued":
+                        job["status"] = "running"
+                        self.running[id] = payload
+                    elif kind == "progress":
+                        job["progress"] = payload
+                        job["updates"] += 1
+                    self.updated.notify_all()
+
+    def check_workers(self):
+        """
+        Fails any running job whose worker process is no longer alive, e.g.
+        because it was killed. The pool replaces the worker but never 
+        reports what happened to the job it was running.
+        """
+        alive = [p.pid for p in mp.active_children()]
+        with self.updated:
+            dead = [(id, self.running[id][1]) for id in self.running 
+                    if self.running[id][0] not in alive]
+        for id, dir in dead:
+            remove_output(dir)
+            self.fail(id, "Worker process running the job stopped")
+
+    def finish(self, id, result):
+        with self.updated:
+            if id not in self.jobs:
+                return
+            if self.jobs[id]["status"] not in ["done","failed"]:
+                self.jobs[id]["status"] = "done"
+                self.jobs[id]["result"] = result
+                self.jobs[id]["finished"] = time.time()
+            self.running.pop(id, None)
+            self.evict()
+            self.updated.notify_all()
+
+    def fail(self, id, e):
+        with self.updated:
+            if id not in self.jobs:
+                return
+            if self.jobs[id]["status"] not in ["done","failed"]:
+                self.jobs[id]["status"] = "failed"
+                self.jobs[id]["error"] = str(e)
+                self.jobs[id]["finished"] = time.time()
+            self.running.pop(id, None)
+            self.evict()
+            self.updated.notify_all()
+
+    def close(self):
+        self.pool.terminate()
+        self.pool.join()
+
+#Functions run in the worker processes
+
+def init_worker(events, dir):
+    #Gives each worker the message queue and the same working directory as
+    #the server, as config and output files are found using relative paths
+    global EVENTS
+    EVENTS = events
+    os.chdir(dir)
+
+def run_job(id, request, dir):
+    """
+    Runs a single job in a worker process, sending its result or error back
+    to the server through the same queue as its progress messages.
+
+    The output file dir is created before the job is reported as started, 
+    so the server knows it belongs to this job if the worker dies.
+    """
+    try:
+        create_output(dir)
+    except Exception as e:
+        EVENTS.put((id, "failed", str(e)))
+        return
+    EVENTS.put((id, "started", (os.getpid(), dir)))
+    try:
+        result = do_job(id, request, dir)
+    except Exception as e:
+        EVENTS.put((id, "failed", str(e)))
+    else:
+        EVENTS.put((id, "done", result))
+
+def do_job(id, request, dir):
+    """
+    Does the work for a single job and returns the result that is sent back
+    to the client.
+
+    If "output" is given in the request the data is written to that file in
+    /output_files and the path is returned, otherwise the data itself is
+    returned.
+    """
+    def progress(i, total):
+        message = {"completed":int(i), "total":int(total)}
+        EVENTS.put((id, "progress", message))
+
+    file = request["json"].replace(".json","") + ".json"
+
+    try:
+        if request["command"] == "time_simulate":
+            data = main.run_time_simulation(
+                request["mode"],
+                file,
+                dir,
+                progress=progress
+            )
+        if request["command"] == "protein_fold_data":
+            data = main.run_protein_fold_data(file, dir, progress=progress)
+    except:
+        #Don't leave behind an empty or partly written output file
+        remove_output(dir)
+        raise
+
+    if request.get("output") is None:
+        remove_output(dir)
+        result = {}
+        for key in data.keys():
+            result[key] = [float(value) for value in data[key]]
+        return {"data":result}
+    result = {"output":dir}
+    if os.path.exists(main.dense_output_path(dir)):
+        result["dense"] = main.dense_output_path(dir)
+    return result
+
+def output_path(name):
+    """
+    Returns the path of the output file for a job, in the same way as
+    main.specify_output_file(). If name is None a temporary file is used.
+    """
+    if name is None:
+        name = "server_%s" % uuid.uuid4().hex
+    check_output_name(name)
+    name = name.strip().replace(".dat","")
+    return os.path.join("output_files", "%s.dat" % name)
+
+def create_output(dir):
+    #Creates the output file, failing if it already exists
+    f = open(dir, "x")
+    f.close()
+
+def check_output_name(name):
+    #Raises a ValueError if name is not the name of a file in /output_files
+    if not isinstance(name, str):
+        raise ValueError("Output must be a file name")
+    name = name.strip()
+    separators = [sep for sep in [os.sep, os.altsep, "/", "\\"] if sep]
+    if name in ["", ".", ".."] or any(sep in name for sep in separators):
+        raise ValueError("Invalid output file name %s" % name)
+
+def remove_output(dir):
+    #Removes output file dir and any dense output saved alongside it
+    for path in [dir, main.dense_output_path(dir)]:
+        if os.path.exists(path):
+            os.remove(path)
+
+#HTTP interface
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """
+    Handles HTTP requests to the server:
+
+        POST /jobs                  Submit a job, returns {"id":...}
+        GET  /jobs                  List all jobs, without their results
+        GET  /jobs/<id>             Current state of a job
+        GET  /jobs/<id>/progress    Streams the progress of a job as one json
+                                    object per line until the job finishes
+        DELETE /jobs/<id>           Remove a finished job
+    """
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/jobs":
+            self.send_json(404, {"error":"Not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length))
+            id = self.server.jobs.submit(request)
+        except ValueError as e:
+            self.send_json(400, {"error":str(e)})
+            return
+        self.send_json(202, {"id":id})
+
+    def do_GET(self):
+        path = self.path.strip("/").split("/")
+        if path == ["jobs"]:
+            with self.server.jobs.updated:
+                ids = list(self.server.jobs.jobs.keys())
+            jobs = [self.server.jobs.summary(id) for id in ids]
+            self.send_json(200, [job for job in jobs if job is not None])
+        elif len(path) == 2 and path[0] == "jobs":
+            job = self.server.jobs.get(path[1])
+            if job is None:
+                self.send_json(404, {"error":"Unknown job"})
+            else:
+                self.send_json(200, job)
+        elif len(path) == 3 and path[0] == "jobs" and path[2] == "progress":
+            if self.server.jobs.get(path[1]) is None:
+                self.send_json(404, {"error":"Unknown job"})
+            else:
+                self.stream_progress(path[1])
+        else:
+            self.send_json(404, {"error":"Not found"})
+
+    def do_DELETE(self):
+        path = self.path.strip("/").split("/")
+        if len(path) != 2 or path[0] != "jobs":
+            self.send_json(404, {"error":"Not found"})
+        elif self.server.jobs.get(path[1]) is None:
+            self.send_json(404, {"error":"Unknown job"})
+        elif not self.server.jobs.delete(path[1]):
+            self.send_json(409, {"error":"Job has not finished"})
+        else:
+            self.send_json(200, {"id":path[1]})
+
+    def stream_progress(self, id):
+        #Sends each progress message as it arrives, followed by the final
+        #state of the job. The connection is closed to end the stream.
+        #If nothing happens for HEARTBEAT seconds the job status is sent, 
+        #so the thread finds out if the client has disconnected.
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        seen = 0
+        finished = False
+        while not finished:
+            job = self.server.jobs.wait(id, seen, timeout=HEARTBEAT)
+            if job is None:
+                #Job was removed while streaming
+                break
+            finished = job["status"] in ["done","failed"]
+            if job["updates"] > seen:
+                self.write_line(job["progress"])
+            elif not finished:
+                self.write_line({"status":job["status"]})
+            seen = job["updates"]
+        if job is not None:
+            self.write_line(job)
+        self.close_connection = True
+
+    def write_line(self, data):
+        self.wfile.write((json.dumps(data) + "\n").encode())
+        self.wfile.flush()
+
+    def send_json(self, code, data):
+        body = json.dumps(data).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        #Don't log every request to the console
+        pass
+
+#Commands that can be submitted as jobs
+JOB_COMMANDS = ["time_simulate","protein_fold_data"]
+
+#Seconds between checks for dead workers, and between status messages sent
+#while streaming progress of a job that has not changed
+WORKER_CHECK = 1
+HEARTBEAT = 10
+
+#Finished jobs are kept for JOB_TTL seconds, and at most MAX_FINISHED_JOBS
+#of the most recent are kept
+JOB_TTL = 3600
+MAX_FINISHED_JOBS = 500
+
+def serve(port=8765, workers=None):
+    """
+    Runs the simulation server on localhost until interrupted. Uses one
+    worker per CPU if workers is not specified.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), RequestHandler)
+    server.jobs = JobServer(workers)
+    print("Simulation server running on http://127.0.0.1:%i" % port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.jobs.close()
+
+if __name__ == "__main__":
+    port = 8765
+    workers = None
+    if len(sys.argv) > 1:
+        port = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        workers = int(sys.argv[2])
+    serve(port, workers)
@@ -0,0 +1,77 @@
+from multiprocessing import shared_memory
+import numpy as np
+
+class SharedResults:
+    """
+    Class to hold the results of several simulation runs in a block of shared
+    memory, so that worker processes can write their data directly into it
+    and the parent process can read it without it being copied.
+
+    Data is stored in a numpy array with shape (runs, samples, species).
+
+    Variables:
+        shape:      tuple   Shape of the array, (runs, samples, species)
+        name:       str     Name of the shared memory block, used by worker
+                            processes to attach to it
+        array:      array   numpy array using the shared memory as its buffer
+
+    Methods:
+        create(cls, runs, samples, species)     Creates a new block
+        attach(cls, name, shape)                Attaches to an existing block
+        run_data(self, run, t, keys)            Returns data for one run as a
+                                                dictionary of arrays
+        close(self)                             Stops using the block
+        unlink(self)                            Frees the block, only called
+                                                by the process that created it
+    """
+
+    def __init__(self, shm, shape):
+        self.shm = shm
+        self.shape = shape
+        self.name = shm.name
+        self.array = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+
+    @classmethod
+    def create(cls, runs, samples, species):
+        """Creates a new zeroed block of shared memory for the results"""
+        shape = (runs, samples, species)
+        size = max(int(np.prod(shape)) * np.dtype(np.float64).itemsize, 1)
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        results = cls(shm, shape)
+        results.array[:] = 0.0
+        return results
+
+    @classmethod
+    def attach(cls, name, shape):
+        """Attaches to a block created by another process"""
+        return cls(shared_memory.SharedMemory(name=name), tuple(shape))
+
+    def run_data(self, run, t, keys):
+        """
+        Returns the data for a single run in the same format as
+        simulate_fixed(), a dictionary with an array for time t and one for
+        each species in keys. The species arrays are views of the shared
+        memory rather than copies, so they must be deleted before close() is
+        called.
+        """
+        data = {"t":t}
+        for j, key in enumerate(keys):
+            data[key] = self.array[run, :, j]
+        return data
+
+    def close(self):
+        #The array must be removed first as it still uses the buffer. Does
+        #nothing if already closed
+        if not hasattr(self, "array"):
+            return
+        del self.array
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+from reaction import Reaction
+from dense_output import DenseOutput
+import main
+
+def make_reaction():
+    #Simple A <-> B reaction
+    reaction = Reaction()
+    reaction.add_species("A", 1.0)
+    reaction.add_species("B", 0.0)
+    reaction.add_process(["A"], ["B"], 1.0)
+    reaction.add_process(["B"], ["A"], 0.5)
+    return reaction
+
+def check_matches_samples(data, dense):
+    #Dense output evaluated at the sample times must give the sampled data
+    values = dense.evaluate(data["t"])
+    for key in dense.keys:
+        assert np.allclose(values[key], data[key], rtol=1e-12, atol=0)
+
+def test_fixed_samples_match_dense_output():
+    reaction = make_reaction()
+    dense = DenseOutput(reaction.get_species_keys())
+    data = main.simulate_fixed(reaction, 1e-3, 2000, sample_freq=7, 
+                               dense=dense)
+    check_matches_samples(data, dense)
+
+def test_shared_memory_samples_match_dense_output():
+    reaction = make_reaction()
+    dense = DenseOutput(reaction.get_species_keys())
+    out = np.zeros((main.fixed_samples(2000, 7), 2))
+    data = main.simulate_fixed(reaction, 1e-3, 2000, sample_freq=7, 
+                               dense=dense, out=out)
+    check_matches_samples(data, dense)
+
+def test_equillibrium_samples_match_dense_output():
+    reaction = make_reaction()
+    dense = DenseOutput(reaction.get_species_keys())
+    data = main.simulate_to_equillibrium(reaction, 1e-3, 1e-3, 
+                                         max_cycles=2000, sample_freq=7, 
+                                         dense=dense)
+    check_matches_samples(data, dense)
+
+def exact_a(t):
+    #Analytic concentration of A for make_reaction(), A(0) = 1, k1 + k2 = 1.5
+    return 1 / 3 + 2 / 3 * np.exp(-1.5 * t)
+
+def run_with_knots_every(dense_freq):
+    reaction = make_reaction()
+    dense = DenseOutput(reaction.get_species_keys())
+    main.simulate_fixed(reaction, 1e-3, 2000, dense=dense, 
+                        dense_freq=dense_freq)
+    return dense
+
+def test_interpolation_between_knots():
+    #Knots every 20 steps, i.e. every 0.02 s, evaluated part way between them
+    dense = run_with_knots_every(20)
+    times = np.arange(100) * 0.02 + 0.37 * 0.02
+    values = dense.evaluate(times)
+
+    #Euler error with delta_t = 1e-3 is below 5e-4 over this run, and the 
+    #interpolation must not add to it noticeably
+    assert np.allclose(values["A"], exact_a(times), rtol=0, atol=5e-4)
+    assert np.allclose(values["A"] + values["B"], 1.0, rtol=0, atol=1e-9)
+
+    #Should agree with the same run keeping every step
+    fine = run_with_knots_every(1).evaluate(times)
+    assert np.allclose(values["A"], fine["A"], rtol=0, atol=5e-5)
+
+def test_resample():
+    dense = run_with_knots_every(20)
+    values = dense.resample(0.0, 2.0, 11, keys=["A"])
+    assert np.allclose(values["t"], np.linspace(0.0, 2.0, 11))
+    assert list(values.keys()) == ["t", "A"]
+    assert np.allclose(values["A"], exact_a(values["t"]), rtol=0, atol=5e-4)
+
+def test_save_and_load(tmp_path):
+    dense = run_with_knots_every(20)
+    dir = str(tmp_path / "run.dense.npz")
+    dense.save(dir)
+    loaded = DenseOutput.load(dir)
+
+    assert loaded.keys == dense.keys
+    assert np.array_equal(loaded.t, dense.t)
+    assert np.array_equal(loaded.y, dense.y)
+    assert np.array_equal(loaded.dydt, dense.dydt)
+    times = np.linspace(0.1, 1.9, 7)
+    assert np.array_equal(loaded.evaluate(times)["B"], 
+                          dense.evaluate(times)["B"])
+
+def test_evaluate_outside_run():
+    dense = run_with_knots_every(20)
+    with pytest.raises(ValueError):
+        dense.evaluate([0.5, 2.5])
+    with pytest.raises(ValueError):
+        dense.evaluate([-0.1])
+
+def test_parse_times():
+    assert np.allclose(main.parse_times("0:2:5"), [0, 0.5, 1, 1.5, 2])
+    assert np.allclose(main.parse_times("0.5,1,2.5"), [0.5, 1, 2.5])